@@ -0,0 +1,46 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Optional AOT-compiled geometry kernel for the exercise detector.
+
+Build (requires Cython):
+    pip install cython
+    python3 setup_geom.py build_ext --inplace
+
+script.py falls back to a NumPy batch implementation when this extension
+is not built, so building it is purely a speed upgrade.
+"""
+
+from libc.math cimport acos, sqrt
+
+DEF RAD2DEG = 57.29577951308232
+
+
+def angles_from_triples(const float[:, ::1] points,
+                        const int[:, ::1] triples,
+                        float[::1] out):
+    """For each (a, b, c) row of index triples, write the angle at b
+    (in degrees) into out. points is an (N, >=2) float32 array of
+    landmark coordinates; only x/y are used."""
+    cdef Py_ssize_t i, n = triples.shape[0]
+    cdef Py_ssize_t ia, ib, ic
+    cdef double bax, bay, bcx, bcy, cosv
+
+    for i in range(n):
+        ia = triples[i, 0]
+        ib = triples[i, 1]
+        ic = triples[i, 2]
+
+        bax = points[ia, 0] - points[ib, 0]
+        bay = points[ia, 1] - points[ib, 1]
+        bcx = points[ic, 0] - points[ib, 0]
+        bcy = points[ic, 1] - points[ib, 1]
+
+        cosv = (bax * bcx + bay * bcy) / (
+            sqrt(bax * bax + bay * bay) * sqrt(bcx * bcx + bcy * bcy) + 1e-6)
+
+        if cosv > 1.0:
+            cosv = 1.0
+        elif cosv < -1.0:
+            cosv = -1.0
+
+        out[i] = <float>(acos(cosv) * RAD2DEG)
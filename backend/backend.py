@@ -13,6 +13,7 @@ from datetime import datetime, timedelta, UTC
 from functools import wraps
 import os
 import json
+import re
 
 # ============================================================================
 # CONFIGURATION
@@ -28,12 +29,13 @@ def load_env():
 
     if os.path.exists(env_path):
         print(f"Loading environment from: {os.path.abspath(env_path)}")
+        # One read + one regex pass over the whole file instead of a Python
+        # per-line loop (skips blank and #-comment lines, splits on the
+        # first "=" - same semantics as before)
         with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ[key.strip()] = value.strip()
+            text = f.read()
+        for key, value in re.findall(r'(?m)^[ \t]*([^#=\s][^=\n]*)=(.*)$', text):
+            os.environ[key.strip()] = value.strip()
     else:
         print("Warning: No .env file found")
 
@@ -4,15 +4,28 @@ Uses MediaPipe to detect jumping jacks, squats, and high knees from webcam
 Updated for MediaPipe 0.10.x API
 """
 
+import os
+
+# Cap the OpenMP/XNNPACK thread pools BEFORE cv2/mediapipe import (they read
+# these at load time). Both libraries default to one worker per logical core,
+# which oversubscribes hyperthreaded CPUs once our capture/compute/display
+# threads are running too. Half the logical cores ~= the physical core count.
+_WORKERS = str(max(1, (os.cpu_count() or 2) // 2))
+os.environ.setdefault("OMP_NUM_THREADS", _WORKERS)
+os.environ.setdefault("OPENBLAS_NUM_THREADS", _WORKERS)
+os.environ.setdefault("XNNPACK_NUM_THREADS", _WORKERS)
+
 import cv2
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 import numpy as np
 import json
-import os
+import logging
 import math
 import time
+import queue
+import threading
 from enum import Enum
 from dataclasses import dataclass
 from typing import Optional, Dict, Tuple, List
@@ -23,6 +36,35 @@ from typing import Optional, Dict, Tuple, List
 
 TESTING = True  # Show webcam window for testing
 
+# Detector logging. State transitions and per-frame status log at DEBUG,
+# reps and target switches at INFO. The INFO default keeps the user-facing
+# rep confirmations visible (they're cooldown-limited, so not hot-path I/O)
+# while DEBUG chatter stays out of the 30 FPS loop. Override with e.g.
+# M4G_LOG=DEBUG.
+logging.basicConfig(level=os.environ.get("M4G_LOG", "INFO"))
+_log = logging.getLogger("m4g")
+
+# Downscale the detector input. Pose Landmarker Lite resamples to 256x256
+# internally anyway, so feeding the full camera frame only adds O(HW)
+# preprocessing cost. Landmarks come back normalized (0..1), so all the
+# x*w / y*h display math is unchanged. Disable (or bump to 288/320) if
+# detection degrades for small/far-away subjects.
+DOWNSCALE_INPUT = True
+DETECT_INPUT_SIZE = 256
+
+# Submit only every Nth frame to the pose model (skip-frame inference).
+# Landmarks move very little in 33ms and every detector uses wide hysteresis
+# thresholds, so reusing the newest result in between halves the inference
+# load. Set to 1 to detect on every frame.
+DETECT_EVERY_N = 2
+
+# Optional fast JSON encoder for the rep-counter writes (2-5x faster than
+# stdlib json; purely a speed upgrade, stdlib is used when not installed)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # File paths
 REP_COUNTER_PATH = os.path.join(os.path.dirname(__file__), "rep_counter.json")
 TARGET_EXERCISE_PATH = os.path.join(os.path.dirname(__file__), "target_exercise.json")
@@ -63,6 +105,15 @@ class PoseLandmark:
     LEFT_FOOT_INDEX = 31
     RIGHT_FOOT_INDEX = 32
 
+# Plain module-level int aliases for the landmark rows detectors still touch
+# per frame (a class-attribute lookup is a dict probe on every access; these
+# resolve as globals). The batched-index tables below bake the rest in at
+# import time.
+L_SHOULDER = PoseLandmark.LEFT_SHOULDER
+R_SHOULDER = PoseLandmark.RIGHT_SHOULDER
+L_ELBOW = PoseLandmark.LEFT_ELBOW
+R_ELBOW = PoseLandmark.RIGHT_ELBOW
+
 # ============================================================================
 # EXERCISE STATES
 # ============================================================================
@@ -76,86 +127,286 @@ class ExerciseType(Enum):
     LATERAL_RAISE = "lateral_raises"
     NONE = "none"
 
-class JumpingJackState(Enum):
-    NEUTRAL = "neutral"
-    ARMS_UP = "arms_up"
-
-class SquatState(Enum):
-    STANDING = "standing"
-    SQUATTING = "squatting"
-
-class BicepCurlState(Enum):
-    DOWN = "down"
-    UP = "up"
-
-class TricepExtensionState(Enum):
-    BENT = "bent"
-    EXTENDED = "extended"
+# The two-state exercises (jumping jack, squat, bicep curl, tricep
+# extension) share one integer state machine: 0 = rest pose (neutral /
+# standing / curled down / bent), 1 = active pose. Each frame computes a
+# condition index cond = (in_active_pose << 1) | in_rest_pose and does two
+# table loads instead of an if/elif ladder. Plain nested tuples - scalar
+# indexing into tuples beats NumPy scalar indexing in CPython.
+_STATE_REST = 0
+_STATE_ACTIVE = 1
+
+# next_state[state][cond]
+_NEXT_STATE = (
+    (0, 0, 1, 1),   # rest: enter active when the active pose is seen
+    (1, 0, 1, 0),   # active: fall back to rest when the rest pose is seen
+)
+# Rep fires on the active->rest edge (jumping jack, squat, bicep curl)
+_REP_ON_REST = (
+    (False, False, False, False),
+    (False, True, False, True),
+)
+# Rep fires on the rest->active edge (tricep extension counts the press-up)
+_REP_ON_ACTIVE = (
+    (False, False, True, True),
+    (False, False, False, False),
+)
 
 # HighKneeState removed - now using boolean flags (left_knee_was_up, right_knee_was_up)
 # LateralRaiseState removed - now using boolean flags (left_arm_was_up, right_arm_was_up)
 
+# String -> ExerciseType lookup for target_exercise.json (replaces the
+# if/elif chain in load_target_exercise; unknown names fall back to SQUAT)
+_EXERCISE_BY_NAME: Dict[str, "ExerciseType"] = {
+    e.value: e for e in ExerciseType if e is not ExerciseType.NONE
+}
+
 # ============================================================================
 # ANGLE CALCULATION
 # ============================================================================
 
-def calculate_angle(point1, point2, point3):
-    """Calculate angle between three points (in degrees)"""
-    a = np.array([point1.x, point1.y])
-    b = np.array([point2.x, point2.y])
-    c = np.array([point3.x, point3.y])
-
+# Optional AOT-compiled geometry kernel (backend/_geom.pyx). Build with
+# `python3 setup_geom.py build_ext --inplace`; without it a Numba JIT of the
+# same scalar loop is tried, and failing that the NumPy batch below is used.
+try:
+    from _geom import angles_from_triples as _angles_from_triples_c
+except ImportError:
+    _angles_from_triples_c = None
+
+_angles_from_triples_nb = None
+if _angles_from_triples_c is None:
+    try:
+        from numba import njit
+    except ImportError:
+        pass
+    else:
+        @njit(cache=True, fastmath=True)
+        def _angles_from_triples_nb(points, triples, out):
+            for i in range(triples.shape[0]):
+                ia, ib, ic = triples[i, 0], triples[i, 1], triples[i, 2]
+                bax = points[ia, 0] - points[ib, 0]
+                bay = points[ia, 1] - points[ib, 1]
+                bcx = points[ic, 0] - points[ib, 0]
+                bcy = points[ic, 1] - points[ib, 1]
+                cosv = (bax * bcx + bay * bcy) / (
+                    math.sqrt(bax * bax + bay * bay) *
+                    math.sqrt(bcx * bcx + bcy * bcy) + 1e-6)
+                cosv = min(1.0, max(-1.0, cosv))
+                out[i] = math.degrees(math.acos(cosv))
+
+        # Warm up the JIT at import so the first real frame doesn't pay the
+        # compile cost (cache=True persists it to disk for later runs)
+        _angles_from_triples_nb(np.zeros((3, 4), dtype=np.float32),
+                                np.array([[0, 1, 2]], dtype=np.int32),
+                                np.empty(1, dtype=np.float32))
+
+def angles_from_triples(points: np.ndarray, triples: np.ndarray,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Batched angle kernel: for each (a, b, c) row in `triples` (indices
+    into `points`, an (N, >=2) float32 coordinate array), return the angle
+    at b in degrees. Dispatches to the Cython extension when built."""
+    if out is None:
+        out = np.empty(len(triples), dtype=np.float32)
+
+    if _angles_from_triples_c is not None:
+        _angles_from_triples_c(points, triples, out)
+        return out
+
+    if _angles_from_triples_nb is not None:
+        _angles_from_triples_nb(points, triples, out)
+        return out
+
+    a = points[triples[:, 0], :2]
+    b = points[triples[:, 1], :2]
+    c = points[triples[:, 2], :2]
     ba = a - b
     bc = c - b
+    cosine = np.einsum('ij,ij->i', ba, bc) / (
+        np.linalg.norm(ba, axis=1) * np.linalg.norm(bc, axis=1) + 1e-6)
+    out[:] = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    return out
 
-    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
-    angle = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-
-    return np.degrees(angle)
+# ============================================================================
+# PER-EXERCISE ANGLE TRIPLES
+# ============================================================================
 
-def calculate_distance(point1, point2):
-    """Calculate normalized distance between two points"""
-    return math.sqrt((point1.x - point2.x)**2 + (point1.y - point2.y)**2)
+# The (a, b, c) landmark triples - angle measured at b - that each exercise's
+# detector reads. Every detector needs exactly one angle per side, so all of
+# a frame's angles come out of ONE angles_from_triples call (row 0 = left,
+# row 1 = right) instead of 2+ scalar calculate_angle calls.
+_ANGLE_TRIPLES: Dict[ExerciseType, np.ndarray] = {
+    ExerciseType.JUMPING_JACK: np.array([
+        [PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_ELBOW],
+        [PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_ELBOW],
+    ], dtype=np.int32),
+    ExerciseType.SQUAT: np.array([
+        [PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE],
+        [PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE],
+    ], dtype=np.int32),
+    ExerciseType.HIGH_KNEES: np.array([
+        [PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE],
+        [PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE],
+    ], dtype=np.int32),
+    ExerciseType.BICEP_CURL: np.array([
+        [PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_ELBOW, PoseLandmark.LEFT_WRIST],
+        [PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_ELBOW, PoseLandmark.RIGHT_WRIST],
+    ], dtype=np.int32),
+    ExerciseType.TRICEP_EXTENSION: np.array([
+        [PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_ELBOW, PoseLandmark.LEFT_WRIST],
+        [PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_ELBOW, PoseLandmark.RIGHT_WRIST],
+    ], dtype=np.int32),
+    ExerciseType.LATERAL_RAISE: np.array([
+        [PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_WRIST],
+        [PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_WRIST],
+    ], dtype=np.int32),
+}
+
+# Landmarks that must be visible before each exercise is detected, as int32
+# index arrays so the visibility check is one vectorized compare against the
+# SoA landmark matrix's visibility column
+_REQUIRED_IDX: Dict[ExerciseType, np.ndarray] = {
+    ExerciseType.JUMPING_JACK: np.array([
+        PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+        PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
+        PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
+        PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP
+    ], dtype=np.int32),
+    ExerciseType.SQUAT: np.array([
+        PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
+        PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
+        PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE
+    ], dtype=np.int32),
+    ExerciseType.HIGH_KNEES: np.array([
+        PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
+        PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
+        PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE
+    ], dtype=np.int32),
+    ExerciseType.BICEP_CURL: np.array([
+        PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+        PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
+        PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST
+    ], dtype=np.int32),
+    ExerciseType.TRICEP_EXTENSION: np.array([
+        PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+        PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
+        PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST
+    ], dtype=np.int32),
+    ExerciseType.LATERAL_RAISE: np.array([
+        PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+        PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
+        PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP
+    ], dtype=np.int32),
+}
+
+# Human-readable names for the visibility warnings (module constant - only
+# needed on the rare missing-landmark path, never rebuilt per call)
+_LANDMARK_NAMES: Dict[int, str] = {
+    PoseLandmark.LEFT_SHOULDER: "Left Shoulder",
+    PoseLandmark.RIGHT_SHOULDER: "Right Shoulder",
+    PoseLandmark.LEFT_ELBOW: "Left Elbow",
+    PoseLandmark.RIGHT_ELBOW: "Right Elbow",
+    PoseLandmark.LEFT_WRIST: "Left Wrist",
+    PoseLandmark.RIGHT_WRIST: "Right Wrist",
+    PoseLandmark.LEFT_HIP: "Left Hip",
+    PoseLandmark.RIGHT_HIP: "Right Hip",
+    PoseLandmark.LEFT_KNEE: "Left Knee",
+    PoseLandmark.RIGHT_KNEE: "Right Knee",
+    PoseLandmark.LEFT_ANKLE: "Left Ankle",
+    PoseLandmark.RIGHT_ANKLE: "Right Ankle",
+}
 
 # ============================================================================
 # DRAWING UTILITIES
 # ============================================================================
 
-def draw_landmarks(frame, landmarks):
+# Cache of pre-rendered text strips. cv2.putText rasterizes every glyph on
+# every call, but most HUD strings only change on state transitions (rep
+# counts, target exercise, positioning tips). Render each unique string once
+# and blit it with a mask afterwards. Only use this for strings with few
+# distinct values - the cache is unbounded, and a cache miss is slower than
+# a plain putText, so per-frame values (e.g. live angles) go straight to
+# cv2.putText instead.
+_text_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray, int]] = {}
+
+def put_text_cached(frame, text, org, scale, color, thickness=1,
+                    font=cv2.FONT_HERSHEY_SIMPLEX):
+    """Draw text using a cached pre-rendered strip (same origin semantics as cv2.putText)"""
+    key = (text, font, scale, color, thickness)
+    cached = _text_cache.get(key)
+    if cached is None:
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        strip = np.zeros((text_h + baseline, max(text_w, 1), 3), dtype=np.uint8)
+        cv2.putText(strip, text, (0, text_h), font, scale, color, thickness)
+        mask = (strip != 0).any(axis=2, keepdims=True)
+        cached = (strip, mask, text_h)
+        _text_cache[key] = cached
+
+    strip, mask, text_h = cached
+    x, y = org
+    h, w = frame.shape[:2]
+    strip_h, strip_w = strip.shape[:2]
+
+    # org is the bottom-left of the text (baseline), matching cv2.putText
+    y0, x0 = y - text_h, x
+    y1, x1 = y0 + strip_h, x0 + strip_w
+
+    # Clip against frame edges
+    y0c, y1c = max(y0, 0), min(y1, h)
+    x0c, x1c = max(x0, 0), min(x1, w)
+    if y0c >= y1c or x0c >= x1c:
+        return
+
+    sub_y, sub_x = y0c - y0, x0c - x0
+    np.copyto(frame[y0c:y1c, x0c:x1c],
+              strip[sub_y:sub_y + (y1c - y0c), sub_x:sub_x + (x1c - x0c)],
+              where=mask[sub_y:sub_y + (y1c - y0c), sub_x:sub_x + (x1c - x0c)])
+
+# High-knees debug colors indexed by hysteresis bucket:
+# 0 = DOWN (angle > 140°) white, 1 = hysteresis zone yellow, 2 = UP (angle < 90°) green
+_KNEE_COLORS = ((255, 255, 255), (0, 255, 255), (0, 255, 0))
+
+# MediaPipe Pose connections (module-level so draw_landmarks doesn't rebuild
+# the list on every call)
+POSE_CONNECTIONS = (
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22),
+    (11, 23), (12, 24), (23, 24),
+    (23, 25), (25, 27), (27, 29), (27, 31),
+    (24, 26), (26, 28), (28, 30), (28, 32),
+    (0, 1), (1, 2), (2, 3), (3, 7),
+    (0, 4), (4, 5), (5, 6), (6, 8),
+    (9, 10)
+)
+
+# Connections as an (N, 2) int32 index array so drawing can gather both
+# endpoints of every segment with one fancy-indexing operation
+_POSE_CONNECTIONS_NP = np.array(POSE_CONNECTIONS, dtype=np.int32)
+
+def draw_landmarks(frame, landmarks, connections=_POSE_CONNECTIONS_NP):
     """Draw pose landmarks on the frame using OpenCV"""
     if not landmarks:
         return
 
     h, w = frame.shape[:2]
 
-    # Define connections (MediaPipe Pose connections)
-    POSE_CONNECTIONS = [
-        (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21),
-        (12, 14), (14, 16), (16, 18), (16, 20), (16, 22),
-        (11, 23), (12, 24), (23, 24),
-        (23, 25), (25, 27), (27, 29), (27, 31),
-        (24, 26), (26, 28), (28, 30), (28, 32),
-        (0, 1), (1, 2), (2, 3), (3, 7),
-        (0, 4), (4, 5), (5, 6), (6, 8),
-        (9, 10)
-    ]
-
-    # Draw connections (thicker and brighter)
-    for connection in POSE_CONNECTIONS:
-        start_idx, end_idx = connection
-        if start_idx < len(landmarks) and end_idx < len(landmarks):
-            start = landmarks[start_idx]
-            end = landmarks[end_idx]
-            start_point = (int(start.x * w), int(start.y * h))
-            end_point = (int(end.x * w), int(end.y * h))
-            cv2.line(frame, start_point, end_point, (0, 255, 255), 3)  # Cyan color, thicker
-
-    # Draw landmarks (larger and brighter)
-    for landmark in landmarks:
-        x = int(landmark.x * w)
-        y = int(landmark.y * h)
-        cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)  # Bright green, larger
-        cv2.circle(frame, (x, y), 6, (255, 255, 255), 1)  # White border
+    # Normalized -> pixel coordinates for all 33 landmarks in one vectorized
+    # pass (the per-landmark int(lm.x * w) math was pure interpreter cost)
+    pts = np.empty((len(landmarks), 2), dtype=np.float32)
+    for i, lm in enumerate(landmarks):
+        pts[i, 0] = lm.x
+        pts[i, 1] = lm.y
+    pts[:, 0] *= w
+    pts[:, 1] *= h
+    pts = pts.astype(np.int32)
+
+    # Draw all connections in one polylines batch (cyan, thicker)
+    conn = connections[(connections < len(landmarks)).all(axis=1)]
+    cv2.polylines(frame, pts[conn], False, (0, 255, 255), 3)
+
+    # Draw landmarks (larger and brighter - OpenCV has no batch circle op)
+    for x, y in pts:
+        cv2.circle(frame, (int(x), int(y)), 5, (0, 255, 0), -1)  # Bright green, larger
+        cv2.circle(frame, (int(x), int(y)), 6, (255, 255, 255), 1)  # White border
 
 # ============================================================================
 # EXERCISE DETECTOR
@@ -168,11 +419,12 @@ class ExerciseDetector:
     # Target exercise to detect (loaded from JSON)
     target_exercise: ExerciseType = ExerciseType.NONE
 
-    # State machines for each exercise
-    jumping_jack_state: JumpingJackState = JumpingJackState.NEUTRAL
-    squat_state: SquatState = SquatState.STANDING
-    bicep_curl_state: BicepCurlState = BicepCurlState.DOWN
-    tricep_extension_state: TricepExtensionState = TricepExtensionState.BENT
+    # State machines for each exercise (0 = rest, 1 = active; driven by the
+    # transition tables above)
+    jumping_jack_state: int = _STATE_REST
+    squat_state: int = _STATE_REST
+    bicep_curl_state: int = _STATE_REST
+    tricep_extension_state: int = _STATE_REST
 
     # Per-leg tracking for high knees (using boolean flags instead of state machine)
     left_knee_was_up: bool = False
@@ -189,9 +441,8 @@ class ExerciseDetector:
     cooldown_frames: int = 0
     COOLDOWN_DURATION: int = 10
 
-    # Target reload counter (check every 30 frames if target changed)
-    reload_counter: int = 0
-    RELOAD_INTERVAL: int = 30
+    # Re-check the target file at most this often (seconds, wall clock)
+    RELOAD_PERIOD: float = 1.0
 
     # Warning counter (print visibility warnings every 30 frames to avoid spam)
     warning_counter: int = 0
@@ -207,59 +458,77 @@ class ExerciseDetector:
                 "tricep_extensions": 0,
                 "lateral_raises": 0
             }
+
+        # mtime stamps so the periodic reloads skip disk entirely when the
+        # JSON files haven't changed (st_mtime_ns is one stat syscall vs
+        # exists + open + json.load)
+        self._target_mtime: Optional[int] = None
+        self._counts_mtime: Optional[int] = None
+
+        # Wall-clock stamp of the last target-reload check
+        self._last_reload = time.monotonic()
+
+        self._dir_checked = False
+
         self.load_target_exercise()
 
-    def check_landmarks_visible(self, landmarks, required_indices, min_visibility=0.5) -> Tuple[bool, List[str]]:
+        # Reusable SoA landmark matrix - one (33, 4) float32 row per landmark
+        # (x, y, z, visibility), filled once per frame so the visibility
+        # check and the angle kernel index NumPy columns instead of walking
+        # MediaPipe's per-landmark Python objects.
+        self._lm = np.empty((33, 4), dtype=np.float32)
+
+        # Reusable buffer for the batched angle kernel + the angles from the
+        # most recent _compute_all_angles call ([left, right], degrees). The
+        # TESTING HUD reads _last_angles instead of recomputing per joint.
+        self._angles_buf = np.empty(2, dtype=np.float32)
+        self._last_angles: Optional[np.ndarray] = None
+
+    def _extract_landmarks(self, landmarks):
+        """Copy MediaPipe's landmark objects into the reusable (33, 4)
+        matrix - the only AoS attribute-access pass of the frame"""
+        lm = self._lm
+        for i, p in enumerate(landmarks):
+            lm[i, 0] = p.x
+            lm[i, 1] = p.y
+            lm[i, 2] = p.z
+            lm[i, 3] = p.visibility
+        n = len(landmarks)
+        if n < 33:
+            # Mark anything the model didn't report as not visible
+            lm[n:, 3] = -1.0
+
+    def _compute_all_angles(self) -> Optional[np.ndarray]:
+        """Compute every joint angle the target exercise needs in one batched
+        angles_from_triples call and cache the result on self._last_angles"""
+        triples = _ANGLE_TRIPLES.get(self.target_exercise)
+        if triples is None:
+            self._last_angles = None
+            return None
+
+        self._last_angles = angles_from_triples(self._lm, triples, out=self._angles_buf)
+        return self._last_angles
+
+    def check_landmarks_visible(self, required_idx, min_visibility=0.5) -> Tuple[bool, List[str]]:
         """
-        Check if required landmarks are visible
+        Check if required landmarks are visible (reads the SoA matrix filled
+        by _extract_landmarks - one vectorized compare, no per-landmark loop)
         Returns: (all_visible: bool, missing_landmarks: list)
         """
-        missing = []
-        landmark_names = {
-            PoseLandmark.LEFT_SHOULDER: "Left Shoulder",
-            PoseLandmark.RIGHT_SHOULDER: "Right Shoulder",
-            PoseLandmark.LEFT_ELBOW: "Left Elbow",
-            PoseLandmark.RIGHT_ELBOW: "Right Elbow",
-            PoseLandmark.LEFT_WRIST: "Left Wrist",
-            PoseLandmark.RIGHT_WRIST: "Right Wrist",
-            PoseLandmark.LEFT_HIP: "Left Hip",
-            PoseLandmark.RIGHT_HIP: "Right Hip",
-            PoseLandmark.LEFT_KNEE: "Left Knee",
-            PoseLandmark.RIGHT_KNEE: "Right Knee",
-            PoseLandmark.LEFT_ANKLE: "Left Ankle",
-            PoseLandmark.RIGHT_ANKLE: "Right Ankle",
-        }
-
-        for idx in required_indices:
-            if idx < len(landmarks):
-                landmark = landmarks[idx]
-                # Check visibility score (MediaPipe provides this)
-                if hasattr(landmark, 'visibility') and landmark.visibility < min_visibility:
-                    missing.append(landmark_names.get(idx, f"Landmark {idx}"))
-            else:
-                missing.append(landmark_names.get(idx, f"Landmark {idx}"))
+        mask = self._lm[required_idx, 3] < min_visibility
+        if not mask.any():
+            return True, []
 
-        return len(missing) == 0, missing
+        missing = [_LANDMARK_NAMES.get(int(idx), f"Landmark {idx}")
+                   for idx in required_idx[mask]]
+        return False, missing
 
-    def detect_jumping_jack(self, landmarks) -> bool:
+    def detect_jumping_jack(self) -> bool:
         """Detect jumping jack and return True if rep completed"""
-        # Get relevant landmarks
-        left_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER]
-        left_elbow = landmarks[PoseLandmark.LEFT_ELBOW]
-        right_elbow = landmarks[PoseLandmark.RIGHT_ELBOW]
-        left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
-        left_hip = landmarks[PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[PoseLandmark.RIGHT_HIP]
-
-        # Calculate arm angles (shoulder-elbow-wrist)
-        left_arm_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-        right_arm_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
-
-        # Calculate shoulder angle (how high arms are raised)
-        left_shoulder_angle = calculate_angle(left_hip, left_shoulder, left_elbow)
-        right_shoulder_angle = calculate_angle(right_hip, right_shoulder, right_elbow)
+        # Shoulder angles (how high arms are raised) from the batched
+        # per-frame kernel call in process_frame
+        left_shoulder_angle = self._last_angles[0]
+        right_shoulder_angle = self._last_angles[1]
 
         # Arms are UP when shoulder angle is small (arms raised above horizontal)
         arms_up = left_shoulder_angle < 100 and right_shoulder_angle < 100
@@ -267,181 +536,135 @@ class ExerciseDetector:
         # Arms are DOWN when shoulder angle is large (arms at sides)
         arms_down = left_shoulder_angle > 140 and right_shoulder_angle > 140
 
-        rep_completed = False
-
-        if self.jumping_jack_state == JumpingJackState.NEUTRAL and arms_up:
-            self.jumping_jack_state = JumpingJackState.ARMS_UP
-        elif self.jumping_jack_state == JumpingJackState.ARMS_UP and arms_down:
-            self.jumping_jack_state = JumpingJackState.NEUTRAL
-            rep_completed = True
+        state = self.jumping_jack_state
+        cond = (bool(arms_up) << 1) | bool(arms_down)
+        self.jumping_jack_state = _NEXT_STATE[state][cond]
+        return _REP_ON_REST[state][cond]
 
-        return rep_completed
-
-    def detect_squat(self, landmarks) -> bool:
+    def detect_squat(self) -> bool:
         """Detect squat and return True if rep completed"""
-        # Get relevant landmarks
-        left_hip = landmarks[PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[PoseLandmark.RIGHT_HIP]
-        left_knee = landmarks[PoseLandmark.LEFT_KNEE]
-        right_knee = landmarks[PoseLandmark.RIGHT_KNEE]
-        left_ankle = landmarks[PoseLandmark.LEFT_ANKLE]
-        right_ankle = landmarks[PoseLandmark.RIGHT_ANKLE]
-
-        # Calculate knee angles
-        left_knee_angle = calculate_angle(left_hip, left_knee, left_ankle)
-        right_knee_angle = calculate_angle(right_hip, right_knee, right_ankle)
-
-        avg_knee_angle = (left_knee_angle + right_knee_angle) / 2
+        # Knee angles from the batched per-frame kernel call in process_frame
+        avg_knee_angle = (self._last_angles[0] + self._last_angles[1]) / 2
 
         # In a squat, knee angle is smaller (< 120 degrees)
         # Standing, knee angle is larger (> 160 degrees)
         is_squatting = avg_knee_angle < 120
         is_standing = avg_knee_angle > 160
 
-        rep_completed = False
+        state = self.squat_state
+        cond = (bool(is_squatting) << 1) | bool(is_standing)
+        new_state = self.squat_state = _NEXT_STATE[state][cond]
+        rep_completed = _REP_ON_REST[state][cond]
 
-        if self.squat_state == SquatState.STANDING and is_squatting:
-            self.squat_state = SquatState.SQUATTING
-            print(f"[SQUAT DEBUG] Knee angle: {avg_knee_angle:.1f}° → Going DOWN")
-        elif self.squat_state == SquatState.SQUATTING and is_standing:
-            self.squat_state = SquatState.STANDING
-            rep_completed = True
-            print(f"[SQUAT DEBUG] Knee angle: {avg_knee_angle:.1f}° → Coming UP - REP COMPLETE!")
+        if new_state != state:
+            if new_state == _STATE_ACTIVE:
+                _log.debug("[SQUAT DEBUG] Knee angle: %.1f° → Going DOWN", avg_knee_angle)
+            else:
+                _log.debug("[SQUAT DEBUG] Knee angle: %.1f° → Coming UP - REP COMPLETE!", avg_knee_angle)
 
         return rep_completed
 
-    def detect_high_knees(self, landmarks) -> bool:
+    def detect_high_knees(self) -> bool:
         """Detect high knees using angle-based detection with hysteresis"""
-        # Get relevant landmarks
-        left_hip = landmarks[PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[PoseLandmark.RIGHT_HIP]
-        left_knee = landmarks[PoseLandmark.LEFT_KNEE]
-        right_knee = landmarks[PoseLandmark.RIGHT_KNEE]
-        left_ankle = landmarks[PoseLandmark.LEFT_ANKLE]
-        right_ankle = landmarks[PoseLandmark.RIGHT_ANKLE]
-
-        # Calculate angles between hip-knee-ankle for each leg
-        left_angle = calculate_angle(left_hip, left_knee, left_ankle)
-        right_angle = calculate_angle(right_hip, right_knee, right_ankle)
+        # Knee angles from the batched per-frame kernel call in process_frame
+        left_knee_angle = self._last_angles[0]
+        right_knee_angle = self._last_angles[1]
 
         # HYSTERESIS THRESHOLDS - wide margin prevents flickering
-        # Small angle = knee raised high (bent)
-        # Large angle = leg straight down
-        UP_THRESHOLD = 90       # Angle must be LESS than this when knee is up
-        DOWN_THRESHOLD = 140    # Angle must be MORE than this when leg is down
-
-        rep_completed = False
-
-        # LEFT LEG: Check for complete cycle (knee up → knee down)
-        if left_angle < UP_THRESHOLD and not self.left_knee_was_up:
-            # Knee angle is small - knee is raised UP
-            self.left_knee_was_up = True
-            print(f"[HIGH KNEES] Left knee UP: angle={left_angle:.1f}°")
-
-        elif left_angle > DOWN_THRESHOLD and self.left_knee_was_up:
-            # Knee angle is large - leg is DOWN - CYCLE COMPLETE
-            self.left_knee_was_up = False
-            rep_completed = True
-            print(f"[HIGH KNEES] Left knee DOWN: angle={left_angle:.1f}° → REP!")
-
-        # RIGHT LEG: Check for complete cycle (knee up → knee down)
-        # Note: Can check both legs in same frame, they're independent
-        if right_angle < UP_THRESHOLD and not self.right_knee_was_up:
-            # Knee angle is small - knee is raised UP
-            self.right_knee_was_up = True
-            print(f"[HIGH KNEES] Right knee UP: angle={right_angle:.1f}°")
-
-        elif right_angle > DOWN_THRESHOLD and self.right_knee_was_up:
-            # Knee angle is large - leg is DOWN - CYCLE COMPLETE
-            self.right_knee_was_up = False
-            rep_completed = True
-            print(f"[HIGH KNEES] Right knee DOWN: angle={right_angle:.1f}° → REP!")
-
-        return rep_completed
-
-    def detect_bicep_curl(self, landmarks) -> bool:
+        # Knee raised high = small angle (< 90°)
+        # Leg straight down = large angle (> 140°)
+        # Branchless update: a rep fires when a leg that was up crosses the
+        # down threshold, and the new flag is "raised now, or was up and
+        # hasn't dropped yet" - plain boolean algebra instead of four
+        # data-dependent branches (legs are independent, both can fire in
+        # the same frame)
+        left_was_up = self.left_knee_was_up
+        right_was_up = self.right_knee_was_up
+
+        rep_left = left_was_up and left_knee_angle > 140
+        rep_right = right_was_up and right_knee_angle > 140
+
+        self.left_knee_was_up = bool(
+            left_knee_angle < 90 or (left_was_up and left_knee_angle <= 140))
+        self.right_knee_was_up = bool(
+            right_knee_angle < 90 or (right_was_up and right_knee_angle <= 140))
+
+        if _log.isEnabledFor(logging.DEBUG):
+            if self.left_knee_was_up and not left_was_up:
+                _log.debug("[HIGH KNEES] Left knee UP: angle=%.1f°", left_knee_angle)
+            if rep_left:
+                _log.debug("[HIGH KNEES] Left knee DOWN: angle=%.1f° → REP!", left_knee_angle)
+            if self.right_knee_was_up and not right_was_up:
+                _log.debug("[HIGH KNEES] Right knee UP: angle=%.1f°", right_knee_angle)
+            if rep_right:
+                _log.debug("[HIGH KNEES] Right knee DOWN: angle=%.1f° → REP!", right_knee_angle)
+
+        return bool(rep_left or rep_right)
+
+    def detect_bicep_curl(self) -> bool:
         """Detect bicep curl and return True if rep completed"""
-        # Get relevant landmarks for both arms
-        left_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER]
-        left_elbow = landmarks[PoseLandmark.LEFT_ELBOW]
-        right_elbow = landmarks[PoseLandmark.RIGHT_ELBOW]
-        left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
-
-        # Calculate elbow angles (shoulder-elbow-wrist)
-        left_elbow_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-        right_elbow_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
-
-        # Average both arms
-        avg_elbow_angle = (left_elbow_angle + right_elbow_angle) / 2
+        # Elbow angles (shoulder-elbow-wrist) from the batched per-frame
+        # kernel call in process_frame, averaged across both arms
+        avg_elbow_angle = (self._last_angles[0] + self._last_angles[1]) / 2
 
         # In curl UP position, elbow angle is small (< 60 degrees)
         # In curl DOWN position, elbow angle is large (> 140 degrees)
         is_curled_up = avg_elbow_angle < 60
         is_curled_down = avg_elbow_angle > 140
 
-        rep_completed = False
+        state = self.bicep_curl_state
+        cond = (bool(is_curled_up) << 1) | bool(is_curled_down)
+        new_state = self.bicep_curl_state = _NEXT_STATE[state][cond]
+        rep_completed = _REP_ON_REST[state][cond]
 
-        if self.bicep_curl_state == BicepCurlState.DOWN and is_curled_up:
-            self.bicep_curl_state = BicepCurlState.UP
-            print(f"[BICEP CURL DEBUG] Elbow angle: {avg_elbow_angle:.1f}° → Curling UP")
-        elif self.bicep_curl_state == BicepCurlState.UP and is_curled_down:
-            self.bicep_curl_state = BicepCurlState.DOWN
-            rep_completed = True
-            print(f"[BICEP CURL DEBUG] Elbow angle: {avg_elbow_angle:.1f}° → Lowering DOWN - REP COMPLETE!")
+        if new_state != state:
+            if new_state == _STATE_ACTIVE:
+                _log.debug("[BICEP CURL DEBUG] Elbow angle: %.1f° → Curling UP", avg_elbow_angle)
+            else:
+                _log.debug("[BICEP CURL DEBUG] Elbow angle: %.1f° → Lowering DOWN - REP COMPLETE!", avg_elbow_angle)
 
         return rep_completed
 
-    def detect_tricep_extension(self, landmarks) -> bool:
+    def detect_tricep_extension(self) -> bool:
         """Detect overhead tricep extension and return True if rep completed
         Requirements:
         - Elbows must be elevated above shoulders (overhead position)
         - Elbow angle changes from bent (~90°) to extended (~140°+)
         """
-        # Get relevant landmarks for both arms
-        left_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER]
-        left_elbow = landmarks[PoseLandmark.LEFT_ELBOW]
-        right_elbow = landmarks[PoseLandmark.RIGHT_ELBOW]
-        left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
-
         # IMPORTANT: Check that elbows are elevated above shoulders (overhead position)
         # In image coordinates, y increases downward, so elevated means SMALLER y value
-        left_elbows_elevated = left_elbow.y < left_shoulder.y
-        right_elbows_elevated = right_elbow.y < right_shoulder.y
+        lm = self._lm
+        left_elbows_elevated = lm[L_ELBOW, 1] < lm[L_SHOULDER, 1]
+        right_elbows_elevated = lm[R_ELBOW, 1] < lm[R_SHOULDER, 1]
 
         # Both elbows must be elevated for this to be an overhead tricep extension
         if not (left_elbows_elevated and right_elbows_elevated):
             # Not in overhead position - don't count as tricep extension
             return False
 
-        # Calculate elbow angles (shoulder-elbow-wrist)
-        left_elbow_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-        right_elbow_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
-
-        # Average both arms
-        avg_elbow_angle = (left_elbow_angle + right_elbow_angle) / 2
+        # Elbow angles (shoulder-elbow-wrist) from the batched per-frame
+        # kernel call in process_frame, averaged across both arms
+        avg_elbow_angle = (self._last_angles[0] + self._last_angles[1]) / 2
 
         # In EXTENDED position, elbow angle is large (> 140 degrees - arm straight up)
         # In BENT position, elbow angle is small (< 90 degrees - hand behind head)
         is_extended = avg_elbow_angle > 140
         is_bent = avg_elbow_angle < 90
 
-        rep_completed = False
+        state = self.tricep_extension_state
+        cond = (bool(is_extended) << 1) | bool(is_bent)
+        new_state = self.tricep_extension_state = _NEXT_STATE[state][cond]
+        rep_completed = _REP_ON_ACTIVE[state][cond]
 
-        if self.tricep_extension_state == TricepExtensionState.BENT and is_extended:
-            self.tricep_extension_state = TricepExtensionState.EXTENDED
-            rep_completed = True
-            print(f"[TRICEP EXTENSION DEBUG] Elbow angle: {avg_elbow_angle:.1f}° (overhead) → Extending UP - REP COMPLETE!")
-        elif self.tricep_extension_state == TricepExtensionState.EXTENDED and is_bent:
-            self.tricep_extension_state = TricepExtensionState.BENT
-            print(f"[TRICEP EXTENSION DEBUG] Elbow angle: {avg_elbow_angle:.1f}° (overhead) → Lowering DOWN")
+        if new_state != state:
+            if new_state == _STATE_ACTIVE:
+                _log.debug("[TRICEP EXTENSION DEBUG] Elbow angle: %.1f° (overhead) → Extending UP - REP COMPLETE!", avg_elbow_angle)
+            else:
+                _log.debug("[TRICEP EXTENSION DEBUG] Elbow angle: %.1f° (overhead) → Lowering DOWN", avg_elbow_angle)
 
         return rep_completed
 
-    def detect_lateral_raise(self, landmarks) -> bool:
+    def detect_lateral_raise(self) -> bool:
         """Detect lateral arm raise - BOTH ARMS must move together
         Requirements:
         - Must see shoulders, wrists, and hips for BOTH sides
@@ -449,10 +672,8 @@ class ExerciseDetector:
         - Don't count if any required joints are out of frame
         """
         # Check visibility of required landmarks FIRST
-        required = [PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
-                   PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
-                   PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP]
-        all_visible, missing = self.check_landmarks_visible(landmarks, required)
+        all_visible, missing = self.check_landmarks_visible(
+            _REQUIRED_IDX[ExerciseType.LATERAL_RAISE])
 
         if not all_visible:
             # Reset state if we can't see required joints
@@ -460,19 +681,12 @@ class ExerciseDetector:
             self.right_arm_was_up = False
             return False
 
-        # Get relevant landmarks
-        left_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER]
-        left_wrist = landmarks[PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[PoseLandmark.RIGHT_WRIST]
-        left_hip = landmarks[PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[PoseLandmark.RIGHT_HIP]
+        # Angles (hip-shoulder-wrist for each arm) from the batched
+        # per-frame kernel call in process_frame
+        left_angle = self._last_angles[0]
+        right_angle = self._last_angles[1]
 
-        # Calculate angles: hip-shoulder-wrist for each arm
-        left_angle = calculate_angle(left_hip, left_shoulder, left_wrist)
-        right_angle = calculate_angle(right_hip, right_shoulder, right_wrist)
-
-        print(f"[LATERAL RAISE DEBUG] L={left_angle:.1f}° R={right_angle:.1f}°")
+        _log.debug("[LATERAL RAISE DEBUG] L=%.1f° R=%.1f°", left_angle, right_angle)
 
         # Thresholds:
         # Arms DOWN (at sides): ~170-180° (nearly straight line hip-shoulder-wrist)
@@ -487,7 +701,7 @@ class ExerciseDetector:
         # Check if arms are TOO HIGH (overhead) - reset state
         if left_angle < OVERHEAD_THRESHOLD or right_angle < OVERHEAD_THRESHOLD:
             if self.left_arm_was_up:
-                print(f"[LATERAL RAISE] Arms overhead (L={left_angle:.1f}° R={right_angle:.1f}°) - resetting state")
+                _log.debug("[LATERAL RAISE] Arms overhead (L=%.1f° R=%.1f°) - resetting state", left_angle, right_angle)
             self.left_arm_was_up = False
             self.right_arm_was_up = False
             return False
@@ -498,115 +712,90 @@ class ExerciseDetector:
         # Check if BOTH arms are DOWN
         both_arms_down = (left_angle < DOWN_THRESHOLD and right_angle < DOWN_THRESHOLD)
 
-        # Debug: print angles every few frames to help tune thresholds
-        if self.reload_counter % 15 == 0:  # Print every 15 frames (~0.5 seconds)
-            print(f"[LATERAL RAISE DEBUG] L={left_angle:.1f}° R={right_angle:.1f}° (Up<{UP_THRESHOLD}°, Down>{DOWN_THRESHOLD}°)")
-
         # State machine: both arms must go UP then DOWN together
         if both_arms_up and not self.left_arm_was_up:
             # BOTH arms raised slightly
             self.left_arm_was_up = True
             self.right_arm_was_up = True
-            print(f"[LATERAL RAISE] Both arms UP: L={left_angle:.1f}° R={right_angle:.1f}°")
+            _log.debug("[LATERAL RAISE] Both arms UP: L=%.1f° R=%.1f°", left_angle, right_angle)
 
         elif both_arms_down and self.left_arm_was_up:
             # BOTH arms lowered to sides - REP COMPLETE
             self.left_arm_was_up = False
             self.right_arm_was_up = False
             rep_completed = True
-            print(f"[LATERAL RAISE] Both arms DOWN: L={left_angle:.1f}° R={right_angle:.1f}° → REP!")
+            _log.debug("[LATERAL RAISE] Both arms DOWN: L=%.1f° R=%.1f° → REP!", left_angle, right_angle)
 
         return rep_completed
 
     def process_frame(self, landmarks):
         """Process a frame and detect exercise + reps (only for target exercise)"""
+        # One clock read per frame for the reload check below (monotonic:
+        # cheaper than time.time and immune to NTP jumps spuriously firing
+        # the timer)
+        now = time.monotonic()
+
         if self.cooldown_frames > 0:
             self.cooldown_frames -= 1
             return
 
-        # Periodically reload target exercise in case it changed
-        self.reload_counter += 1
-        if self.reload_counter >= self.RELOAD_INTERVAL:
+        # Reload the target at most once per second of wall clock - FPS
+        # independent, one float compare in the steady state
+        if now - self._last_reload >= self.RELOAD_PERIOD:
+            self._last_reload = now
             old_target = self.target_exercise
             self.load_target_exercise()
             if old_target != self.target_exercise:
                 # Reset states when target changes
-                self.jumping_jack_state = JumpingJackState.NEUTRAL
-                self.squat_state = SquatState.STANDING
-                self.bicep_curl_state = BicepCurlState.DOWN
-                self.tricep_extension_state = TricepExtensionState.BENT
+                self.jumping_jack_state = _STATE_REST
+                self.squat_state = _STATE_REST
+                self.bicep_curl_state = _STATE_REST
+                self.tricep_extension_state = _STATE_REST
                 self.left_knee_was_up = False
                 self.right_knee_was_up = False
                 self.left_arm_was_up = False
                 self.right_arm_was_up = False
-                print(f"[TARGET] Switched to: {self.target_exercise.value}")
-            self.reload_counter = 0
+                _log.info("[TARGET] Switched to: %s", self.target_exercise.value)
 
         # Only detect the target exercise - but first check if required joints are visible
         rep_completed = False
 
-        # Define required landmarks for each exercise
-        required_landmarks = {
-            ExerciseType.JUMPING_JACK: [
-                PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
-                PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
-                PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
-                PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP
-            ],
-            ExerciseType.SQUAT: [
-                PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
-                PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
-                PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE
-            ],
-            ExerciseType.HIGH_KNEES: [
-                PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
-                PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
-                PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE
-            ],
-            ExerciseType.BICEP_CURL: [
-                PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
-                PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
-                PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST
-            ],
-            ExerciseType.TRICEP_EXTENSION: [
-                PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
-                PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
-                PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST
-            ],
-            ExerciseType.LATERAL_RAISE: [
-                PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
-                PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
-                PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP
-            ]
-        }
+        # One AoS->SoA pass per frame: everything below reads the (33, 4)
+        # NumPy matrix instead of MediaPipe's landmark objects
+        self._extract_landmarks(landmarks)
 
         # Check if required landmarks are visible for current exercise
-        if self.target_exercise in required_landmarks:
-            all_visible, missing = self.check_landmarks_visible(landmarks, required_landmarks[self.target_exercise])
+        required_idx = _REQUIRED_IDX.get(self.target_exercise)
+        if required_idx is not None:
+            all_visible, missing = self.check_landmarks_visible(required_idx)
 
             if not all_visible:
                 # Only print warning every WARNING_INTERVAL frames to avoid spam
                 self.warning_counter += 1
                 if self.warning_counter >= self.WARNING_INTERVAL:
-                    print(f"⚠ Cannot detect {self.target_exercise.value} - Missing: {', '.join(missing)}")
+                    _log.warning("⚠ Cannot detect %s - Missing: %s", self.target_exercise.value, ", ".join(missing))
                     self.warning_counter = 0
                 return
             else:
                 # Reset warning counter when all landmarks are visible again
                 self.warning_counter = 0
 
+        # All of this frame's joint angles in one batched kernel call - the
+        # individual detectors below just read self._last_angles
+        self._compute_all_angles()
+
         if self.target_exercise == ExerciseType.JUMPING_JACK:
-            rep_completed = self.detect_jumping_jack(landmarks)
+            rep_completed = self.detect_jumping_jack()
         elif self.target_exercise == ExerciseType.SQUAT:
-            rep_completed = self.detect_squat(landmarks)
+            rep_completed = self.detect_squat()
         elif self.target_exercise == ExerciseType.HIGH_KNEES:
-            rep_completed = self.detect_high_knees(landmarks)
+            rep_completed = self.detect_high_knees()
         elif self.target_exercise == ExerciseType.BICEP_CURL:
-            rep_completed = self.detect_bicep_curl(landmarks)
+            rep_completed = self.detect_bicep_curl()
         elif self.target_exercise == ExerciseType.TRICEP_EXTENSION:
-            rep_completed = self.detect_tricep_extension(landmarks)
+            rep_completed = self.detect_tricep_extension()
         elif self.target_exercise == ExerciseType.LATERAL_RAISE:
-            rep_completed = self.detect_lateral_raise(landmarks)
+            rep_completed = self.detect_lateral_raise()
 
         # Increment counter if rep completed
         if rep_completed:
@@ -620,64 +809,82 @@ class ExerciseDetector:
             else:
                 self.cooldown_frames = self.COOLDOWN_DURATION  # 10 frames for others
 
+            # Write immediately: the backend reads-and-resets this file, so
+            # deferring the write would race its resets (reps are sub-Hz and
+            # the atomic save is cheap, so there's nothing to debounce)
             self.save_counts()
-            print(f"✓ {self.target_exercise.value}: {self.rep_counts[self.target_exercise.value]} reps")
+            _log.info("✓ %s: %d reps", self.target_exercise.value, self.rep_counts[self.target_exercise.value])
 
     def save_counts(self):
-        """Save rep counts to JSON file"""
+        """Save rep counts to JSON file (atomic: temp file + os.replace, so
+        the backend never reads a half-written file)"""
         try:
-            # Ensure directory exists if there is one
-            dir_path = os.path.dirname(REP_COUNTER_PATH)
-            if dir_path:
-                os.makedirs(dir_path, exist_ok=True)
+            # Ensure directory exists if there is one (checked once)
+            if not self._dir_checked:
+                dir_path = os.path.dirname(REP_COUNTER_PATH)
+                if dir_path:
+                    os.makedirs(dir_path, exist_ok=True)
+                self._dir_checked = True
+
+            tmp_path = REP_COUNTER_PATH + ".tmp"
+            if orjson is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(self.rep_counts, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.rep_counts, f, indent=2)
+            os.replace(tmp_path, REP_COUNTER_PATH)
 
-            with open(REP_COUNTER_PATH, 'w') as f:
-                json.dump(self.rep_counts, f, indent=2)
+            # Remember our own write so the next load_counts doesn't re-read it
+            self._counts_mtime = os.stat(REP_COUNTER_PATH).st_mtime_ns
         except Exception as e:
-            print(f"Error saving counts: {e}")
+            _log.error("Error saving counts: %s", e)
 
     def load_counts(self):
-        """Load existing rep counts from JSON file"""
+        """Load rep counts from JSON file (no-op when the file is unchanged
+        since the last load/save - one stat call instead of a full read)"""
         try:
-            if os.path.exists(REP_COUNTER_PATH):
-                with open(REP_COUNTER_PATH, 'r') as f:
-                    self.rep_counts = json.load(f)
-            else:
+            try:
+                mtime = os.stat(REP_COUNTER_PATH).st_mtime_ns
+            except FileNotFoundError:
                 self.save_counts()  # Create file with default counts
+                return
+
+            if mtime == self._counts_mtime:
+                return
+
+            with open(REP_COUNTER_PATH, 'r') as f:
+                self.rep_counts = json.load(f)
+            self._counts_mtime = mtime
         except Exception as e:
-            print(f"Error loading counts: {e}")
+            _log.error("Error loading counts: %s", e)
 
     def load_target_exercise(self):
-        """Load target exercise from JSON file"""
+        """Load target exercise from JSON file (no-op when the file is
+        unchanged since the last load - one stat call instead of a full read)"""
         try:
-            if os.path.exists(TARGET_EXERCISE_PATH):
-                with open(TARGET_EXERCISE_PATH, 'r') as f:
-                    data = json.load(f)
-                    target = data.get("target", "squats")
-                    # Convert string to ExerciseType
-                    if target == "jumping_jacks":
-                        self.target_exercise = ExerciseType.JUMPING_JACK
-                    elif target == "squats":
-                        self.target_exercise = ExerciseType.SQUAT
-                    elif target == "high_knees":
-                        self.target_exercise = ExerciseType.HIGH_KNEES
-                    elif target == "bicep_curls":
-                        self.target_exercise = ExerciseType.BICEP_CURL
-                    elif target == "tricep_extensions":
-                        self.target_exercise = ExerciseType.TRICEP_EXTENSION
-                    elif target == "lateral_raises":
-                        self.target_exercise = ExerciseType.LATERAL_RAISE
-                    else:
-                        self.target_exercise = ExerciseType.SQUAT
-                    print(f"[TARGET] Loaded target exercise: {self.target_exercise.value}")
-            else:
+            try:
+                mtime = os.stat(TARGET_EXERCISE_PATH).st_mtime_ns
+            except FileNotFoundError:
                 # Create default file
                 self.target_exercise = ExerciseType.SQUAT
                 with open(TARGET_EXERCISE_PATH, 'w') as f:
                     json.dump({"target": "squats"}, f, indent=2)
-                print(f"[TARGET] Created default target exercise: squats")
+                self._target_mtime = os.stat(TARGET_EXERCISE_PATH).st_mtime_ns
+                _log.info("[TARGET] Created default target exercise: squats")
+                return
+
+            if mtime == self._target_mtime:
+                return
+
+            with open(TARGET_EXERCISE_PATH, 'r') as f:
+                data = json.load(f)
+            target = data.get("target", "squats")
+            self.target_exercise = _EXERCISE_BY_NAME.get(target, ExerciseType.SQUAT)
+            self._target_mtime = mtime
+            _log.info("[TARGET] Loaded target exercise: %s", self.target_exercise.value)
         except Exception as e:
-            print(f"Error loading target exercise: {e}")
+            _log.error("Error loading target exercise: %s", e)
             self.target_exercise = ExerciseType.SQUAT
 
 # ============================================================================
@@ -710,11 +917,24 @@ def main():
             print(model_url)
             return
 
+    # Latest detection result, written by MediaPipe's callback thread.
+    # LIVE_STREAM mode pipelines inference internally, so detect_async
+    # returns immediately and the result for a frame arrives here slightly
+    # later - reading a one-frame-old result is fine for the hysteresis
+    # rep-counter state machines.
+    latest_result = [None]
+    result_lock = threading.Lock()
+
+    def _on_result(result, output_image, timestamp_ms):
+        with result_lock:
+            latest_result[0] = result
+
     # Initialize MediaPipe Pose Landmarker
     base_options = python.BaseOptions(model_asset_path=model_path)
     options = vision.PoseLandmarkerOptions(
         base_options=base_options,
-        running_mode=vision.RunningMode.VIDEO,
+        running_mode=vision.RunningMode.LIVE_STREAM,
+        result_callback=_on_result,
         num_poses=1,
         min_pose_detection_confidence=0.1,  # Very low for maximum detection
         min_pose_presence_confidence=0.1,   # Very low for maximum detection
@@ -735,10 +955,29 @@ def main():
         return
 
     # Set camera properties for better reliability
+    # Ask USB cams for native MJPEG instead of raw YUYV - much less USB
+    # bandwidth, which is what usually caps them below 30 FPS at 640x480
+    # (best-effort: ignored by backends/cams that don't support it)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     cap.set(cv2.CAP_PROP_FPS, 30)
 
+    # Keep the driver-side queue at one frame so a transient slowdown in the
+    # capture thread can't build up a backlog of stale frames (best-effort:
+    # not every backend honors it, in which case it's a no-op)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    # Read back what the camera actually negotiated - some cams silently
+    # ignore requested modes and fall back to the nearest supported one,
+    # which would change the per-frame pixel budget
+    actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    actual_fps = cap.get(cv2.CAP_PROP_FPS)
+    print(f"Camera mode: {actual_w}x{actual_h} @ {actual_fps:.0f} FPS")
+    if (actual_w, actual_h) != (640, 480):
+        print("Warning: camera ignored requested 640x480 mode")
+
     # Give camera time to warm up
     print("Initializing camera...")
     time.sleep(2)
@@ -771,52 +1010,187 @@ def main():
     print("\nPress 'q' in the video window to quit")
     print("="*60 + "\n")
 
+    # Pre-allocated, aligned RGB buffer reused every frame. cvtColor writes
+    # into it via dst=, and mp.Image is constructed around the same
+    # underlying pointer each frame, so no per-frame allocation happens on
+    # the conversion path.
+    rgb_buf = np.require(np.empty_like(test_frame), requirements=['C', 'A'])
+
+    # Pre-allocated buffer for the downscaled detector input
+    small_rgb = np.empty((DETECT_INPUT_SIZE, DETECT_INPUT_SIZE, 3), dtype=np.uint8)
+
+    # Preallocated black blocks for the HUD backgrounds. Blending just the
+    # HUD rectangle against these replaces the old full-frame copy + blend:
+    # ~60-150KB of traffic per overlay instead of ~2.7MB, and the rest of
+    # the frame is never touched. Panel sizes are clamped to the negotiated
+    # frame - cv2.addWeighted needs equal shapes, so hard-coded 400/500px
+    # panels would crash on a camera that fell back to a smaller mode.
+    frame_h, frame_w = test_frame.shape[:2]
+    hud_h, hud_w = min(240, frame_h), min(400, frame_w)
+    sq_h, sq_w = min(80, frame_h), min(400, frame_w)
+    hk_h, hk_w = min(105, frame_h), min(500, frame_w)
+    nopose_h = min(180, frame_h)
+    hud_black = np.zeros((hud_h, hud_w, 3), dtype=np.uint8)
+    debug_black = np.zeros((hk_h, hk_w, 3), dtype=np.uint8)
+    nopose_black = np.zeros((nopose_h, frame_w, 3), dtype=np.uint8)
+
+    # HUD text sprite: all seven status lines pre-rendered into one 240x400
+    # block that is re-rasterized only when the target or a rep count
+    # changes; steady-state frames blit it over the dimmed background in a
+    # single masked copy instead of seven per-line blits.
+    hud_sprite = np.zeros((240, 400, 3), dtype=np.uint8)
+    hud_mask = None
+    hud_key = None
+
+    # Hoist hot-loop constants to locals - each of these is a LOAD_ATTR
+    # (module/enum attribute lookup) that Python would otherwise re-resolve
+    # on every single frame
+    INTER_AREA = cv2.INTER_AREA
+    MPImage = mp.Image
+    SRGB = mp.ImageFormat.SRGB
+    SQUAT = ExerciseType.SQUAT
+    HIGH_KNEES = ExerciseType.HIGH_KNEES
+
     frame_count = 0
     consecutive_errors = 0
     MAX_CONSECUTIVE_ERRORS = 10
     pose_detected_count = 0
     no_pose_count = 0
 
-    while cap.isOpened():
-        ret, frame = cap.read()
+    # Monotonic clock origin for MediaPipe timestamps
+    t0 = time.monotonic_ns()
+
+    # Three-stage pipeline: capture -> compute -> display, one thread per
+    # stage connected by small drop-stale queues, so steady-state FPS is set
+    # by the slowest stage instead of the sum of all three. cv2.imshow stays
+    # on the main thread (required on macOS).
+    cap_q = queue.Queue(maxsize=2)
+    disp_q = queue.Queue(maxsize=2)
+    stop_event = threading.Event()
+
+    def _put_latest(q, item):
+        # Drop the oldest queued item rather than blocking the producer -
+        # bounded latency matters more than completeness for live video
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def capture_loop():
+        nonlocal consecutive_errors
+
+        # try/finally so an unexpected exception still signals the other
+        # stages - otherwise the display loop would spin forever on an
+        # empty queue with no live thread to feed it (and no 'q' to quit)
+        try:
+            while not stop_event.is_set() and cap.isOpened():
+                ret, frame = cap.read()
 
-        if not ret or frame is None:
-            consecutive_errors += 1
-            if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                print("Error: Too many consecutive frame read failures")
-                break
-            continue
+                if not ret or frame is None:
+                    consecutive_errors += 1
+                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                        print("Error: Too many consecutive frame read failures")
+                        break
+                    continue
 
-        consecutive_errors = 0
+                consecutive_errors = 0
 
-        # Flip frame horizontally for mirror view
-        frame = cv2.flip(frame, 1)
+                # Flip frame horizontally for mirror view
+                frame = cv2.flip(frame, 1)
+                _put_latest(cap_q, frame)
+        finally:
+            stop_event.set()
 
-        # Convert to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def compute_loop():
+        nonlocal frame_count, pose_detected_count, no_pose_count
 
-        # Create MediaPipe Image
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        # Same try/finally as capture_loop: a crash here must stop the
+        # pipeline, not leave the display loop waiting on disp_q forever
+        try:
+            while not stop_event.is_set():
+                try:
+                    frame = cap_q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                frame_count += 1  # Drives skip-frame cadence + periodic debug prints
+
+                # Skip-frame inference: only every DETECT_EVERY_N-th frame gets
+                # converted and submitted; in between, the newest callback result
+                # is reused below, so the convert/resize work is skipped too
+                if frame_count % DETECT_EVERY_N == 0:
+                    # BGR->RGB via a reversed-channel view: frame[:, :, ::-1] moves no
+                    # memory, and copying it into the contiguous reusable buffer is a
+                    # single strided pass instead of a dedicated cvtColor sweep
+                    np.copyto(rgb_buf, frame[:, :, ::-1])
+
+                    # Create MediaPipe Image (downscaled - the display frame stays native res)
+                    if DOWNSCALE_INPUT:
+                        cv2.resize(rgb_buf, (DETECT_INPUT_SIZE, DETECT_INPUT_SIZE),
+                                   dst=small_rgb, interpolation=INTER_AREA)
+                        mp_image = MPImage(image_format=SRGB, data=small_rgb)
+                    else:
+                        mp_image = MPImage(image_format=SRGB, data=rgb_buf)
+
+                    # Use real elapsed time for the timestamp. The internal tracker
+                    # smooths landmarks based on inter-frame deltas, so feeding it
+                    # fake fixed 33ms ticks misbehaves whenever a frame takes longer
+                    # (slow drawing, system hiccup) or frames get skipped.
+                    timestamp_ms = (time.monotonic_ns() - t0) // 1_000_000
+
+                    # Submit to MediaPipe - non-blocking, inference is pipelined
+                    # behind capture and the result lands in latest_result via the
+                    # callback above
+                    try:
+                        landmarker.detect_async(mp_image, timestamp_ms)
+                    except Exception as e:
+                        print(f"Error processing frame: {e}")
+                        continue
+
+                with result_lock:
+                    results = latest_result[0]
+
+                if results is None:
+                    # No callback has fired yet (first few frames)
+                    continue
+
+                # Debug: log detection status every 30 frames
+                if frame_count % 30 == 0:
+                    if results.pose_landmarks and len(results.pose_landmarks) > 0:
+                        _log.debug("✓ Pose detected! (Frame %d)", frame_count)
+                        pose_detected_count += 1
+                    else:
+                        _log.debug("⚠ No pose detected (Frame %d)", frame_count)
+                        no_pose_count += 1
 
-        # Use frame count for timestamp (more reliable than CAP_PROP_POS_MSEC)
-        timestamp_ms = frame_count * 33  # Assuming ~30 fps
-        frame_count += 1
+                # Rep counting runs here in the compute stage, off the render
+                # thread - the HUD only reads the detector's cached state
+                if results.pose_landmarks and len(results.pose_landmarks) > 0:
+                    detector.process_frame(results.pose_landmarks[0])
 
-        # Process with MediaPipe
+                _put_latest(disp_q, (frame, results))
+        finally:
+            stop_event.set()
+
+    capture_thread = threading.Thread(target=capture_loop, daemon=True)
+    compute_thread = threading.Thread(target=compute_loop, daemon=True)
+    capture_thread.start()
+    compute_thread.start()
+
+    while not stop_event.is_set():
         try:
-            results = landmarker.detect_for_video(mp_image, timestamp_ms)
-        except Exception as e:
-            print(f"Error processing frame: {e}")
+            frame, results = disp_q.get(timeout=0.5)
+        except queue.Empty:
             continue
-
-        # Debug: Print detection status every 30 frames
-        if frame_count % 30 == 0:
-            if results.pose_landmarks and len(results.pose_landmarks) > 0:
-                print(f"✓ Pose detected! (Frame {frame_count})")
-                pose_detected_count += 1
-            else:
-                print(f"⚠ No pose detected (Frame {frame_count})")
-                no_pose_count += 1
+        except KeyboardInterrupt:
+            # Ctrl+C is the exit path when no window is shown
+            stop_event.set()
+            break
 
         # Draw UI elements if testing mode
         if TESTING:
@@ -825,143 +1199,131 @@ def main():
             if results.pose_landmarks and len(results.pose_landmarks) > 0:
                 landmarks = results.pose_landmarks[0]
 
-                # Process frame for exercise detection
-                detector.process_frame(landmarks)
-
-                # Draw landmarks
+                # Rep counting already ran in the compute stage; this block
+                # only draws, reading the detector's cached state
                 draw_landmarks(frame, landmarks)
 
-                # Draw semi-transparent background for text
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (0, 0), (400, 240), (0, 0, 0), -1)
-                cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
-
-                # Display status - POSE DETECTED
-                cv2.putText(frame, "POSE DETECTED", (10, 25),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-                # Display target exercise and counts
-                cv2.putText(frame, f"Target: {detector.target_exercise.value}",
-                           (10, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-                cv2.putText(frame, f"Jumping Jacks: {detector.rep_counts['jumping_jacks']}",
-                           (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                cv2.putText(frame, f"Squats: {detector.rep_counts['squats']}",
-                           (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                cv2.putText(frame, f"High Knees: {detector.rep_counts['high_knees']}",
-                           (10, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                cv2.putText(frame, f"Bicep Curls: {detector.rep_counts['bicep_curls']}",
-                           (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                cv2.putText(frame, f"Tricep Ext: {detector.rep_counts['tricep_extensions']}",
-                           (10, 185), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                cv2.putText(frame, f"Lateral Raise: {detector.rep_counts['lateral_raises']}",
-                           (10, 210), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
+                # Semi-transparent background for text: dim just the HUD
+                # rectangle against the preallocated black block
+                frame[0:hud_h, 0:hud_w] = cv2.addWeighted(
+                    frame[0:hud_h, 0:hud_w], 0.6, hud_black, 0.4, 0)
+
+                # Display status + target + counts via the cached HUD sprite,
+                # re-rendered only when something in it actually changed
+                counts = detector.rep_counts
+                key = (detector.target_exercise.value,
+                       counts['jumping_jacks'], counts['squats'],
+                       counts['high_knees'], counts['bicep_curls'],
+                       counts['tricep_extensions'], counts['lateral_raises'])
+                if key != hud_key:
+                    hud_sprite[:] = 0
+                    put_text_cached(hud_sprite, "POSE DETECTED", (10, 25), 0.6, (0, 255, 0), 2)
+                    put_text_cached(hud_sprite, f"Target: {key[0]}",
+                                    (10, 55), 0.7, (0, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"Jumping Jacks: {key[1]}",
+                                    (10, 85), 0.5, (255, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"Squats: {key[2]}",
+                                    (10, 110), 0.5, (255, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"High Knees: {key[3]}",
+                                    (10, 135), 0.5, (255, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"Bicep Curls: {key[4]}",
+                                    (10, 160), 0.5, (255, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"Tricep Ext: {key[5]}",
+                                    (10, 185), 0.5, (255, 255, 255), 2)
+                    put_text_cached(hud_sprite, f"Lateral Raise: {key[6]}",
+                                    (10, 210), 0.5, (255, 255, 255), 2)
+                    hud_mask = (hud_sprite != 0).any(axis=2, keepdims=True)
+                    hud_key = key
+
+                # Clip sprite and mask to the frame - on a camera mode smaller
+                # than the 240x400 sprite the full-size copy would raise
+                np.copyto(frame[0:hud_h, 0:hud_w], hud_sprite[:hud_h, :hud_w],
+                          where=hud_mask[:hud_h, :hud_w])
 
                 # Debug info for squats
-                if detector.target_exercise == ExerciseType.SQUAT:
-                    # Calculate knee angle for debug display
-                    left_knee_angle = calculate_angle(
-                        landmarks[PoseLandmark.LEFT_HIP],
-                        landmarks[PoseLandmark.LEFT_KNEE],
-                        landmarks[PoseLandmark.LEFT_ANKLE]
-                    )
-                    right_knee_angle = calculate_angle(
-                        landmarks[PoseLandmark.RIGHT_HIP],
-                        landmarks[PoseLandmark.RIGHT_KNEE],
-                        landmarks[PoseLandmark.RIGHT_ANKLE]
-                    )
-                    avg_knee = (left_knee_angle + right_knee_angle) / 2
+                if detector.target_exercise == SQUAT and detector._last_angles is not None:
+                    # Reuse the knee angles the detector just computed
+                    avg_knee = float(detector._last_angles[0] + detector._last_angles[1]) / 2
 
                     # Show squat state and angle at bottom
-                    debug_bg = frame.copy()
-                    cv2.rectangle(debug_bg, (0, h-80), (400, h), (0, 0, 0), -1)
-                    cv2.addWeighted(debug_bg, 0.6, frame, 0.4, 0, frame)
-
-                    cv2.putText(frame, f"Squat State: {detector.squat_state.value}",
-                               (10, h-50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
+                    frame[h-sq_h:h, 0:sq_w] = cv2.addWeighted(
+                        frame[h-sq_h:h, 0:sq_w], 0.4, debug_black[:sq_h, :sq_w], 0.6, 0)
+
+                    squat_state = "squatting" if detector.squat_state else "standing"
+                    put_text_cached(frame, f"Squat State: {squat_state}",
+                                    (10, h-50), 0.5, (255, 255, 0), 2)
+                    # Angle changes every frame - render directly, caching a
+                    # strip per 0.1° value would just grow the cache forever
                     cv2.putText(frame, f"Knee Angle: {avg_knee:.1f}° (down<120, up>160)",
-                               (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+                                (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
 
                 # Debug info for high knees
-                elif detector.target_exercise == ExerciseType.HIGH_KNEES:
-                    # Calculate knee angles
-                    left_angle = calculate_angle(
-                        landmarks[PoseLandmark.LEFT_HIP],
-                        landmarks[PoseLandmark.LEFT_KNEE],
-                        landmarks[PoseLandmark.LEFT_ANKLE]
-                    )
-                    right_angle = calculate_angle(
-                        landmarks[PoseLandmark.RIGHT_HIP],
-                        landmarks[PoseLandmark.RIGHT_KNEE],
-                        landmarks[PoseLandmark.RIGHT_ANKLE]
-                    )
+                elif detector.target_exercise == HIGH_KNEES and detector._last_angles is not None:
+                    # Reuse the knee angles the detector just computed
+                    left_angle = float(detector._last_angles[0])
+                    right_angle = float(detector._last_angles[1])
 
                     # Show high knee state and angles at bottom
-                    debug_bg = frame.copy()
-                    cv2.rectangle(debug_bg, (0, h-105), (500, h), (0, 0, 0), -1)
-                    cv2.addWeighted(debug_bg, 0.6, frame, 0.4, 0, frame)
+                    frame[h-hk_h:h, 0:hk_w] = cv2.addWeighted(
+                        frame[h-hk_h:h, 0:hk_w], 0.4, debug_black, 0.6, 0)
 
                     # Show per-leg state (boolean flags)
                     left_state = "UP" if detector.left_knee_was_up else "DOWN"
                     right_state = "UP" if detector.right_knee_was_up else "DOWN"
-                    cv2.putText(frame, f"States: L={left_state} R={right_state}",
-                               (10, h-75), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
-
-                    # Color code knee angles based on hysteresis thresholds
-                    # Green if < UP threshold (90°), Yellow if in hysteresis zone, White if > DOWN threshold (140°)
-                    if left_angle < 90:
-                        left_color = (0, 255, 0)  # Green - UP (small angle)
-                    elif left_angle < 140:
-                        left_color = (0, 255, 255)  # Yellow - Hysteresis zone
-                    else:
-                        left_color = (255, 255, 255)  # White - DOWN (large angle)
+                    put_text_cached(frame, f"States: L={left_state} R={right_state}",
+                                    (10, h-75), 0.5, (255, 255, 0), 2)
 
-                    if right_angle < 90:
-                        right_color = (0, 255, 0)  # Green - UP (small angle)
-                    elif right_angle < 140:
-                        right_color = (0, 255, 255)  # Yellow - Hysteresis zone
-                    else:
-                        right_color = (255, 255, 255)  # White - DOWN (large angle)
+                    # Color code knee angles based on hysteresis thresholds.
+                    # Branchless: bucket each leg by the two thresholds and
+                    # index the table instead of an if/elif chain per leg
+                    left_color = _KNEE_COLORS[(left_angle < 140) + (left_angle < 90)]
+                    right_color = _KNEE_COLORS[(right_angle < 140) + (right_angle < 90)]
 
+                    # Angles change every frame - render directly, caching a
+                    # strip per 0.1° value would just grow the cache forever
                     cv2.putText(frame, f"Left: {left_angle:.1f}° (up<90, down>140)",
-                               (10, h-45), cv2.FONT_HERSHEY_SIMPLEX, 0.45, left_color, 1)
+                                (10, h-45), cv2.FONT_HERSHEY_SIMPLEX, 0.45, left_color, 1)
                     cv2.putText(frame, f"Right: {right_angle:.1f}° (up<90, down>140)",
-                               (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.45, right_color, 1)
+                                (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.45, right_color, 1)
             else:
                 # No pose detected - still show camera feed with instructions
-                # Draw semi-transparent background for text
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (0, 0), (w, 180), (0, 0, 0), -1)
-                cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
-
-                # Display instructions
-                cv2.putText(frame, "NO POSE DETECTED", (10, 35),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 3)
-                cv2.putText(frame, "POSITIONING TIPS:", (10, 70),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(frame, "1. Stand further back (6-10 feet)", (10, 100),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
-                cv2.putText(frame, "2. Show your FULL body (head to feet)", (10, 125),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
-                cv2.putText(frame, "3. Face the camera directly", (10, 150),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+                # (dim just the instruction banner, not the whole frame)
+                frame[0:nopose_h, 0:w] = cv2.addWeighted(
+                    frame[0:nopose_h, 0:w], 0.4, nopose_black[:, :w], 0.6, 0)
+
+                # Display instructions (all static strings - cached after first frame)
+                put_text_cached(frame, "NO POSE DETECTED", (10, 35), 0.9, (0, 0, 255), 3)
+                put_text_cached(frame, "POSITIONING TIPS:", (10, 70), 0.6, (255, 255, 255), 2)
+                put_text_cached(frame, "1. Stand further back (6-10 feet)", (10, 100),
+                                0.5, (0, 255, 255), 2)
+                put_text_cached(frame, "2. Show your FULL body (head to feet)", (10, 125),
+                                0.5, (0, 255, 255), 2)
+                put_text_cached(frame, "3. Face the camera directly", (10, 150),
+                                0.5, (0, 255, 255), 2)
 
             # Add quit instruction at bottom
-            cv2.putText(frame, "Press 'q' to quit", (10, h - 20),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-        else:
-            # Not in testing mode - still process landmarks for counting
-            if results.pose_landmarks and len(results.pose_landmarks) > 0:
-                detector.process_frame(results.pose_landmarks[0])
+            put_text_cached(frame, "Press 'q' to quit", (10, h - 20),
+                            0.5, (200, 200, 200), 1)
+        # (non-TESTING mode: rep counting already happened in the compute
+        # stage, nothing to draw)
 
         # Show frame if testing mode
         if TESTING:
             cv2.imshow('Motion4Good - Exercise Detector', frame)
 
-        # Break on 'q' key
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            # Break on 'q' key. pollKey is non-blocking - waitKey(1) sleeps
+            # at least 1ms (up to ~15ms on Windows) every frame.
+            key = cv2.pollKey()
+            if key != -1 and (key & 0xFF) == ord('q'):
+                stop_event.set()
+                break
+        # Non-TESTING mode has no window to poll - exit via Ctrl+C
+        # (KeyboardInterrupt), handled below
 
     # Cleanup
+    stop_event.set()
+    capture_thread.join(timeout=2.0)
+    compute_thread.join(timeout=2.0)
     cap.release()
     cv2.destroyAllWindows()
     landmarker.close()
@@ -0,0 +1,12 @@
+"""
+Build script for the optional _geom Cython extension
+Usage: python3 setup_geom.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="m4g-geom",
+    ext_modules=cythonize("_geom.pyx", language_level=3),
+)